@@ -0,0 +1,89 @@
+import re
+import torch
+from prompts import SYSTEM_PROMPT, CLASSIFY_PROMPT, SCORE_PROMPT
+
+
+class AIRelevanceClassifier:
+    """判断论文是否与AI和磁约束核聚变相关，支持生成和打分两种模式"""
+
+    def __init__(self, model, tokenizer, mode='generate', prompt_template=None,
+                 max_new_tokens=50, do_sample=True, threshold=0.5, prefilter_keywords=None,
+                 verbose=True):
+        """
+        Args:
+            model, tokenizer: 已加载的模型
+            mode: 'generate'生成回答并查找"True"；'score'只计算一次前向，
+                用第一个token为"True"的概率作为分数
+            prompt_template: 提示词，需包含{title}和{abstract}，默认按mode选择
+            max_new_tokens: generate模式最多生成的token数
+            do_sample: generate模式是否采样
+            threshold: 分数不低于该值判为相关
+            prefilter_keywords: 关键词列表（正则），标题和摘要都不匹配时直接判为不相关，不调用模型
+            verbose: 是否打印判为相关的分析结果
+        """
+        if mode not in ('generate', 'score'):
+            raise ValueError("Unsupported mode. Use 'generate' or 'score'.")
+        self.model = model
+        self.tokenizer = tokenizer
+        self.mode = mode
+        if prompt_template is None:
+            prompt_template = CLASSIFY_PROMPT if mode == 'generate' else SCORE_PROMPT
+        self.prompt_template = prompt_template
+        self.max_new_tokens = max_new_tokens
+        self.do_sample = do_sample
+        self.threshold = threshold
+        self.prefilter = re.compile('|'.join(prefilter_keywords), re.IGNORECASE) if prefilter_keywords else None
+        self.verbose = verbose
+
+        # "True"/"False"的第一个token，用于score模式
+        self.true_id = tokenizer.encode("True", add_special_tokens=False)[0]
+        self.false_id = tokenizer.encode("False", add_special_tokens=False)[0]
+
+    def build_inputs(self, title, abstract):
+        """构造模型输入"""
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": self.prompt_template.format(title=title, abstract=abstract)}
+        ]
+        text = self.tokenizer.apply_chat_template(
+            messages,
+            tokenize=False,
+            add_generation_prompt=True
+        )
+        return self.tokenizer([text], return_tensors="pt").to(self.model.device)
+
+    def score(self, title, abstract):
+        """返回论文相关的分数（0~1），generate模式下为0或1"""
+        if self.prefilter and not self.prefilter.search(f"{title} {abstract}"):
+            return 0.0
+
+        with torch.no_grad():
+            model_inputs = self.build_inputs(title, abstract)
+
+            if self.mode == 'score':
+                logits = self.model(**model_inputs).logits[0, -1]
+                pair = torch.stack([logits[self.true_id], logits[self.false_id]]).float()
+                return torch.softmax(pair, dim=0)[0].item()
+
+            input_length = model_inputs.input_ids.shape[1]  # 获取输入长度
+            generated_ids = self.model.generate(
+                **model_inputs,
+                max_new_tokens=self.max_new_tokens,  # 默认50为经过测试的合适值
+                do_sample=self.do_sample
+            )
+
+            # 只获取新生成的部分（最后一次回答）
+            response = self.tokenizer.batch_decode(
+                generated_ids[:, input_length:],
+                skip_special_tokens=True
+            )[0]
+
+        if "True" in response:
+            if self.verbose:
+                print(f"AI analysis result: {response}")  # 打印分析结果
+            return 1.0
+        return 0.0
+
+    def is_ai_related(self, title, abstract):
+        """判断论文是否与AI相关"""
+        return self.score(title, abstract) >= self.threshold
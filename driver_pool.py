@@ -0,0 +1,148 @@
+import threading
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+class DriverPool:
+    """有界的无头Chrome驱动池，负责健康检查和按页数回收"""
+
+    def __init__(self, size=2, max_pages=50, page_timeout=30, headless=True):
+        """
+        Args:
+            size: 驱动池最大驱动数，同时也是并发下载数
+            max_pages: 每个驱动访问多少页面后关闭重建
+            page_timeout: 显式等待页面加载的超时时间（秒）
+            headless: 是否使用无头模式
+        """
+        self.size = size
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.headless = headless
+
+        # 空闲驱动和已创建数量都由同一个Condition保护，名额释放或驱动归还时唤醒等待的线程
+        self._idle = []
+        self._page_counts = {}
+        self._created = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # 所有驱动共享的HTTP连接池，实际的PDF下载走这里
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _create_driver(self):
+        """创建新的Chrome驱动"""
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.set_page_load_timeout(self.page_timeout)
+        self._page_counts[id(driver)] = 0
+        return driver
+
+    def _is_healthy(self, driver):
+        """检查驱动是否仍可响应"""
+        try:
+            driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        """关闭驱动并释放名额"""
+        self._page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    def _get_driver(self):
+        """取出空闲驱动，名额未满时新建，否则等待驱动归还或名额释放"""
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("DriverPool is closed")
+                    if self._idle:
+                        driver = self._idle.pop()
+                        break
+                    if self._created < self.size:
+                        self._created += 1
+                        driver = None
+                        break
+                    self._cond.wait()
+
+            if driver is None:
+                try:
+                    return self._create_driver()
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._is_healthy(driver):
+                return driver
+            print("Driver unhealthy, recreating...")
+            self._discard(driver)
+
+    def _release(self, driver):
+        """归还驱动，达到页数上限或池已关闭时回收"""
+        with self._cond:
+            recycle = self._closed or self._page_counts.get(id(driver), 0) >= self.max_pages
+            if not recycle:
+                self._idle.append(driver)
+                self._cond.notify()
+        if recycle:
+            self._discard(driver)
+
+    @contextmanager
+    def acquire(self):
+        """借用一个驱动，使用完毕后自动归还"""
+        driver = self._get_driver()
+        try:
+            yield driver
+        except Exception:
+            # 出错的驱动可能处于异常状态，直接回收
+            self._discard(driver)
+            raise
+        else:
+            self._release(driver)
+
+    def load(self, driver, url):
+        """打开页面并显式等待加载完成，替代固定sleep"""
+        driver.get(url)
+        self._page_counts[id(driver)] = self._page_counts.get(id(driver), 0) + 1
+        WebDriverWait(driver, self.page_timeout).until(
+            lambda d: d.execute_script('return document.readyState') == 'complete'
+        )
+
+    def fetch(self, driver, url, headers=None, timeout=60):
+        """用浏览器的cookies和User-Agent通过共享连接池请求url"""
+        cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
+        headers = dict(headers or {})
+        headers['User-Agent'] = driver.execute_script('return navigator.userAgent')
+        return self.session.get(url, headers=headers, cookies=cookies, timeout=timeout)
+
+    def close(self):
+        """关闭所有驱动和连接池，正在使用的驱动归还时关闭"""
+        with self._cond:
+            self._closed = True
+            drivers = self._idle
+            self._idle = []
+            self._cond.notify_all()
+        for driver in drivers:
+            self._discard(driver)
+        self.session.close()
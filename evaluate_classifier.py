@@ -0,0 +1,240 @@
+"""
+评估AI相关性分类器的不同配置（模型、打分模式、预过滤、量化、提示词），
+报告precision/recall、每篇论文耗时和显存/内存占用，并扫描阈值。
+
+用法：
+    python evaluate_classifier.py --data labeled.xlsx --variants variants.json --target-recall 0.95
+
+标注数据支持 .xlsx / .csv / .jsonl，需包含 title、abstract、label 三列（label 为 1/0 或 True/False，
+无法识别的标注会报错，缺少标注的行会被跳过）。
+variants.json 为配置列表，例如：
+    [
+        {"name": "baseline"},
+        {"name": "score", "mode": "score"},
+        {"name": "score-prefilter", "mode": "score",
+         "prefilter_keywords": ["learning", "neural", "machine", "network", "artificial intelligence", "data-driven"]},
+        {"name": "3b-score", "model_name": "Qwen/Qwen2.5-3B-Instruct", "mode": "score"},
+        {"name": "8bit-score", "mode": "score", "model_kwargs": {"load_in_8bit": true}}
+    ]
+除 name、model_name、model_kwargs 外的字段都传给 AIRelevanceClassifier。
+"""
+import argparse
+import gc
+import json
+import os
+import time
+import pandas as pd
+import psutil
+import torch
+from modelscope import AutoModelForCausalLM, AutoTokenizer
+from classifier import AIRelevanceClassifier
+
+
+DEFAULT_MODEL = "Qwen/Qwen2.5-7B-Instruct"
+
+DEFAULT_VARIANTS = [
+    {"name": "generate", "mode": "generate"},
+    {"name": "score", "mode": "score"},
+]
+
+DEFAULT_THRESHOLDS = [0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+def load_labeled_data(path):
+    """读取标注数据，返回包含title、abstract、label列的DataFrame"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.xlsx', '.xls'):
+        df = pd.read_excel(path)
+    elif ext == '.csv':
+        df = pd.read_csv(path)
+    elif ext == '.jsonl':
+        df = pd.read_json(path, lines=True)
+    else:
+        raise ValueError("Unsupported data file. Use .xlsx, .csv or .jsonl.")
+
+    for col in ('title', 'abstract', 'label'):
+        if col not in df.columns:
+            raise ValueError(f"Missing column '{col}' in {path}")
+
+    # 缺少标注的行不能参与评估，跳过并提示
+    missing = df['label'].isna() | (df['label'].astype(str).str.strip() == '')
+    if missing.any():
+        print(f"Skipping {int(missing.sum())} rows without label")
+        df = df[~missing].copy()
+
+    df['title'] = df['title'].fillna('').astype(str)
+    df['abstract'] = df['abstract'].fillna('').astype(str)
+    # 报错中的行号为数据文件中的原始行序号（从0开始，不含表头）
+    df['label'] = [parse_label(x, i) for i, x in zip(df.index, df['label'])]
+    return df.reset_index(drop=True)
+
+
+def parse_label(value, row):
+    """将标注解析为布尔值，无法识别时报错而不是当作负例"""
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ('1', '1.0', 'true', 'yes'):
+            return True
+        if text in ('0', '0.0', 'false', 'no'):
+            return False
+    else:
+        # 数值标注（含空单元格导致的float列，如1.0）和布尔值
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = None
+        if number == 1:
+            return True
+        if number == 0:
+            return False
+    raise ValueError(f"Invalid label {value!r} in row {row}. Use 1/0 or True/False.")
+
+
+def load_model(model_name, model_kwargs=None):
+    """加载模型和分词器"""
+    model = AutoModelForCausalLM.from_pretrained(
+        model_name,
+        torch_dtype="auto",
+        device_map="auto",
+        trust_remote_code=True,
+        **(model_kwargs or {})
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return model, tokenizer
+
+
+def cpu_memory_mb():
+    """当前进程的常驻内存（RSS，MB）"""
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+
+def compute_metrics(labels, predictions):
+    """计算precision、recall和F1"""
+    tp = sum(1 for y, p in zip(labels, predictions) if y and p)
+    fp = sum(1 for y, p in zip(labels, predictions) if not y and p)
+    fn = sum(1 for y, p in zip(labels, predictions) if y and not p)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1, 'tp': tp, 'fp': fp, 'fn': fn}
+
+
+def run_variant(variant, df, model, tokenizer):
+    """
+    用一个配置对全部标注数据打分，返回分数列表和资源占用
+    gpu_peak_mb为推理期间的显存峰值（含模型权重），cpu_rss_delta_mb为推理前后进程内存的变化
+    """
+    options = {k: v for k, v in variant.items() if k not in ('name', 'model_name', 'model_kwargs')}
+    options.setdefault('verbose', False)
+    classifier = AIRelevanceClassifier(model, tokenizer, **options)
+
+    if torch.cuda.is_available():
+        torch.cuda.reset_peak_memory_stats()
+    cpu_before = cpu_memory_mb()
+
+    scores = []
+    latencies = []
+    for _, row in df.iterrows():
+        start = time.perf_counter()
+        scores.append(classifier.score(row['title'], row['abstract']))
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        latencies.append(time.perf_counter() - start)
+
+    resources = {
+        'latency_mean_s': sum(latencies) / len(latencies),
+        'latency_p95_s': sorted(latencies)[int(0.95 * (len(latencies) - 1))],
+        'gpu_peak_mb': torch.cuda.max_memory_allocated() / 1024 ** 2 if torch.cuda.is_available() else None,
+        'cpu_rss_mb': cpu_memory_mb(),
+    }
+    resources['cpu_rss_delta_mb'] = resources['cpu_rss_mb'] - cpu_before
+    return scores, classifier, resources
+
+
+def evaluate(df, variants, thresholds, target_recall):
+    """评估所有配置，返回每个配置每个阈值的结果"""
+    results = []
+    loaded = {}
+    model = tokenizer = classifier = None
+    for variant in variants:
+        name = variant.get('name', json.dumps(variant, ensure_ascii=False))
+        model_name = variant.get('model_name', DEFAULT_MODEL)
+        model_kwargs = variant.get('model_kwargs')
+        key = (model_name, json.dumps(model_kwargs, sort_keys=True))
+
+        # 同一模型只加载一次，切换模型时先释放之前模型的所有引用，避免两个模型同时占用显存
+        if key not in loaded:
+            model = tokenizer = classifier = None
+            loaded.clear()
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            print(f"\nLoading model {model_name} {model_kwargs or ''}")
+            cpu_before_load = cpu_memory_mb()
+            model, tokenizer = load_model(model_name, model_kwargs)
+            model_memory = {
+                'gpu_model_mb': torch.cuda.memory_allocated() / 1024 ** 2 if torch.cuda.is_available() else None,
+                'cpu_model_mb': cpu_memory_mb() - cpu_before_load,
+            }
+            loaded[key] = (model, tokenizer, model_memory)
+        model, tokenizer, model_memory = loaded[key]
+
+        print(f"Evaluating variant '{name}' on {len(df)} papers...")
+        scores, classifier, resources = run_variant(variant, df, model, tokenizer)
+
+        # generate模式分数只有0/1，只评估配置的阈值
+        variant_thresholds = thresholds if classifier.mode == 'score' else [classifier.threshold]
+        for threshold in variant_thresholds:
+            predictions = [score >= threshold for score in scores]
+            metrics = compute_metrics(df['label'].tolist(), predictions)
+            results.append({'variant': name, 'model_name': model_name, 'mode': classifier.mode,
+                            'threshold': threshold, **metrics, **model_memory, **resources})
+
+    results = pd.DataFrame(results)
+    results['meets_target'] = results['recall'] >= target_recall
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate AI relevance classifier variants")
+    parser.add_argument('--data', required=True, help="labeled titles/abstracts (.xlsx/.csv/.jsonl)")
+    parser.add_argument('--variants', help="JSON file with a list of classifier variants")
+    parser.add_argument('--thresholds', help="comma separated thresholds for score mode")
+    parser.add_argument('--target-recall', type=float, default=0.95)
+    parser.add_argument('--limit', type=int, help="only evaluate the first N papers")
+    parser.add_argument('--output', default='classifier_eval.xlsx')
+    args = parser.parse_args()
+
+    df = load_labeled_data(args.data)
+    if args.limit:
+        df = df.head(args.limit)
+    print(f"Loaded {len(df)} papers ({int(df['label'].sum())} positive)")
+
+    variants = DEFAULT_VARIANTS
+    if args.variants:
+        with open(args.variants, encoding='utf-8') as f:
+            variants = json.load(f)
+    thresholds = DEFAULT_THRESHOLDS
+    if args.thresholds:
+        thresholds = [float(t) for t in args.thresholds.split(',')]
+
+    results = evaluate(df, variants, thresholds, args.target_recall)
+
+    pd.set_option('display.width', 200)
+    print("\n" + results.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    results.to_excel(args.output, index=False)
+    print(f"\nResults saved to {args.output}")
+
+    # 在满足召回率目标的配置中选择最快的
+    candidates = results[results['meets_target']].sort_values(['latency_mean_s', 'precision'], ascending=[True, False])
+    if candidates.empty:
+        print(f"No variant reaches recall {args.target_recall}")
+    else:
+        best = candidates.iloc[0]
+        print(f"Fastest variant with recall >= {args.target_recall}: '{best['variant']}' "
+              f"(threshold {best['threshold']}, precision {best['precision']:.3f}, "
+              f"recall {best['recall']:.3f}, {best['latency_mean_s']:.3f}s/paper)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,12 @@ def main():
         scraper.scrape_papers(2020, 2021, 1, 12) # 2020-2021年, 1-12月
         # scraper.scrape_papers(2021, 2021, 9, 9)
         scraper.save_to_excel()
+
+        # 离线批量生成内容简介：爬取时使用PaperScraper("Nuclear Fusion", defer_summary=True)，
+        # 之后运行以下代码（复用已加载的模型，也可单独运行PaperSummarizer()）
+        # from summarizer import PaperSummarizer
+        # summarizer = PaperSummarizer(model=scraper.model, tokenizer=scraper.tokenizer)
+        # summarizer.summarize_file("ai_fusion_papers.xlsx")
     except Exception as e:
         print(f"Error occurred: {e}")
         import traceback
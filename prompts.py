@@ -0,0 +1,24 @@
+SYSTEM_PROMPT = "你是一个专业的核聚变领域专家。'disruption', 'stellarator', 'renormalization'分别翻译为'破裂', '仿星器', '重整化'。'SOL', 'ITER'则不用翻译。"
+
+# 提示词中的缩进和空白行（含行尾空格）与原实现保持一致，修改会改变模型输入的token
+
+# AI相关性判断标准，CLASSIFY_PROMPT和SCORE_PROMPT共用，只有回答要求不同
+CLASSIFY_CRITERIA = """
+        请判断以下论文是否与人工智能和磁约束核聚变相关。
+        判断标准：
+        1. 论文涉及机器学习、深度学习、神经网络等AI技术，
+        2. 论文应用于磁约束核聚变领域
+        3. 如果只是普通的数值模拟或者物理分析，不算是AI相关
+        
+        标题：{title}
+        摘要：{abstract}
+"""
+
+CLASSIFY_PROMPT = CLASSIFY_CRITERIA + """        
+        请分析后回答"True"或"False"，并用中文简要说明原因。
+        """
+
+# score模式只读取第一个生成token的概率，要求先回答True/False
+SCORE_PROMPT = CLASSIFY_CRITERIA + """        
+        只回答"True"或"False"。
+        """
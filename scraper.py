@@ -2,27 +2,40 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from modelscope import AutoModelForCausalLM, AutoTokenizer
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
 from random import uniform, choice
 import torch
 import os
+import re
 from PDFExtractor.pdf_extractor import PDFExtractor
+from summarizer import build_summary_messages, summary_prompt_id
+from classifier import AIRelevanceClassifier
+from driver_pool import DriverPool
 import time
 
 
 class PaperScraper:
-    def __init__(self, journal, use_selenium=False):
+    def __init__(self, journal, use_selenium=False, defer_summary=False,
+                 driver_pool_size=2, max_pages_per_driver=50, metadata_mode='listing',
+                 classifier_options=None):
         """
         Args:
             journal: 期刊名称
             use_selenium: 是否使用selenium下载PDF，默认False使用requests
+            defer_summary: 是否跳过爬取时的内容简介生成，之后用PaperSummarizer离线批量生成
+            driver_pool_size: selenium模式下无头浏览器数量，即并发下载数
+            max_pages_per_driver: 每个浏览器访问多少页面后重建
+            metadata_mode: 发布日期和作者单位的来源。'listing'从期刊列表页和文章页HTML提取，
+                缺失时才下载PDF；'pdf'始终下载PDF提取
+            classifier_options: 传给AIRelevanceClassifier的参数，例如{'mode': 'score', 'threshold': 0.3}，
+                可用evaluate_classifier.py选择
         """
+        if metadata_mode not in ('listing', 'pdf'):
+            raise ValueError("Unsupported metadata_mode. Use 'listing' or 'pdf'.")
         self.journal = journal
+        self.defer_summary = defer_summary
+        self.metadata_mode = metadata_mode
         # 初始化Qwen模型
         self.model_name = "Qwen/Qwen2.5-7B-Instruct"
         self.model = AutoModelForCausalLM.from_pretrained(
@@ -35,15 +48,16 @@ class PaperScraper:
         
         print(f"Model device: {next(self.model.parameters()).device}")
         
+        self.classifier = AIRelevanceClassifier(self.model, self.tokenizer, **(classifier_options or {}))
+        
         self.papers = []
         
         # 是否使用selenium
         self.use_selenium = use_selenium
         if use_selenium:
-            chrome_options = Options()
-            # chrome_options.add_argument('--headless')  # 无头模式
-            self.driver = webdriver.Chrome(options=chrome_options)
-            print("Using Selenium")
+            # 浏览器按需创建，首次下载时才启动
+            self.driver_pool = DriverPool(size=driver_pool_size, max_pages=max_pages_per_driver)
+            print(f"Using Selenium (pool size {driver_pool_size})")
         else:
             print("Using Requests")
         
@@ -120,6 +134,12 @@ class PaperScraper:
         # 移除"Published"前缀
         date_str = date_str.replace('Published', '').strip()
         
+        # 已是数字格式，例如 "2019/10/30" 或 "2019-10-30"
+        match = re.match(r'^(\d{4})[/-](\d{1,2})[/-](\d{1,2})', date_str)
+        if match:
+            year, month, day = match.groups()
+            return f"{year}/{month.zfill(2)}/{day.zfill(2)}"
+        
         # 月份映射
         month_map = {
             'January': '01', 'February': '02', 'March': '03', 'April': '04',
@@ -128,16 +148,74 @@ class PaperScraper:
         }
         
         try:
-            # 解析日期字符串，例如 "30 October 2019"
+            # 解析日期字符串，例如 "30 October 2019"，也支持缩写 "30 Oct 2019"
             day, month, year = date_str.split()
             day = day.zfill(2)  # 确保日期是两位数
-            month = month_map.get(month, '01')
-            print(f"{year}/{month}/{day}")
+            month = month_map.get(month) or next(
+                (num for name, num in month_map.items() if name[:3] == month[:3].capitalize()), '01')
             return f"{year}/{month}/{day}"
         except Exception as e:
             print(f"Error formatting date '{date_str}': {e}")
             return date_str
 
+    def extract_published_date(self, elem):
+        """从HTML元素（列表页论文条目或文章页）的文本中匹配"Published"日期"""
+        text = ' '.join(elem.get_text(' ').split())
+        match = re.search(r'Published\s*(?:online\s*)?(\d{1,2}\s+[A-Za-z]+\s+\d{4})', text)
+        if match:
+            return self.format_pub_date(match.group(1))
+        return ''
+
+    def get_article_page(self, doi):
+        """获取文章落地页HTML（不含PDF）"""
+        url = f"https://iopscience.iop.org/article/{doi}"
+        try:
+            sleep(uniform(1, 3))
+            response = requests.get(url, headers=self.get_headers(), timeout=30)
+            if 'login' in response.url.lower() or response.status_code != 200:
+                print(f"Access denied or redirected. Status code: {response.status_code}")
+                return None
+            return response.text
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+    def parse_article_metadata(self, html):
+        """
+        从文章落地页HTML中提取发表日期和作者单位
+        返回: dict包含pub_date、first_institution和second_institution
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        metadata = {'pub_date': '', 'first_institution': '', 'second_institution': ''}
+        
+        # 发表日期：优先使用citation元数据，其次匹配页面中的"Published"文本
+        for name in ('citation_online_date', 'citation_publication_date', 'citation_date', 'dc.date'):
+            meta = soup.find('meta', attrs={'name': name})
+            if meta and meta.get('content'):
+                metadata['pub_date'] = self.format_pub_date(meta['content'].strip())
+                break
+        if not metadata['pub_date']:
+            metadata['pub_date'] = self.extract_published_date(soup)
+        
+        # 作者单位：优先使用citation_author_institution，其次查找页面中的单位列表
+        affiliations = [meta['content'].strip() for meta in soup.find_all('meta', attrs={'name': 'citation_author_institution'})
+                        if meta.get('content')]
+        if not affiliations:
+            for elem in soup.find_all(class_=lambda c: c and 'affiliation' in c):
+                for item in elem.find_all(['p', 'li']) or [elem]:
+                    affiliations.append(' '.join(item.get_text(' ').split()))
+        
+        # 去掉开头的编号并去重，保持原有顺序
+        unique = []
+        for affiliation in affiliations:
+            affiliation = re.sub(r'^\d+\s*', '', affiliation).strip()
+            if affiliation and affiliation not in unique:
+                unique.append(affiliation)
+        metadata['first_institution'] = unique[0] if unique else ''
+        metadata['second_institution'] = unique[1] if len(unique) > 1 else ''
+        
+        return metadata
+
     def parse_paper_info(self, html, volume):
         """解析网页提取论文信息"""
         soup = BeautifulSoup(html, 'html.parser')
@@ -153,7 +231,8 @@ class PaperScraper:
                 'first_institution': '',
                 'second_institution': '',
                 'summary': '',
-                'pub_date': ''
+                'pub_date': '',
+                'abstract': ''
             }
             try:
                 # 提取标题
@@ -170,6 +249,7 @@ class PaperScraper:
                     abstract = abstract_elem.find('p').text.strip()
                 if not abstract:
                     continue
+                paper_info['abstract'] = abstract
                 
                 print(f"Processing paper: {title}")
                 # 提取DOI
@@ -185,24 +265,17 @@ class PaperScraper:
                 if indexer:
                     paper_info['volume_issue'] = f"{volume} {indexer.text.strip()}"
                 
+                # 提取列表页中的发表日期
+                if self.metadata_mode == 'listing':
+                    paper_info['pub_date'] = self.extract_published_date(paper)
+                
                 # 使用模型判断是否为AI相关论文并生成内容简介
                 if self.is_ai_related(title, abstract):
-                    # 生成内容简介
-                    summary = self.generate_summary(title, abstract)
-                    paper_info['summary'] = summary
+                    # 生成内容简介（defer_summary时留空，由PaperSummarizer离线生成）
+                    if not self.defer_summary:
+                        paper_info['summary'] = self.generate_summary(title, abstract)
                     paper_info['journal'] = self.journal
                     
-                    # 下载PDF并提取pub_data, affiliations
-                    if paper_info['doi']:
-                        path = self.download_pdf(doi, title)
-                        if path:
-                            extractor = PDFExtractor()
-                            pub_date = extractor.extract_pub_data(path)
-                            first_institution, second_institution = extractor.extract_affiliations(path)
-                            paper_info['pub_date'] = pub_date
-                            paper_info['first_institution'] = first_institution
-                            paper_info['second_institution'] = second_institution
-                    
                     papers_info.append(paper_info)
                     print(f"Found AI-related paper: {title}")
             
@@ -212,26 +285,43 @@ class PaperScraper:
                 print(traceback.format_exc())
                 continue
         
+        # listing模式下先从文章落地页补全缺失的字段
+        # 只有一个作者单位的论文没有second_institution，不视为缺失
+        fields = ('pub_date', 'first_institution', 'second_institution')
+        required = ('pub_date', 'first_institution')
+        if self.metadata_mode == 'listing':
+            for paper_info in papers_info:
+                if not paper_info['doi'] or all(paper_info[field] for field in required):
+                    continue
+                html = self.get_article_page(paper_info['doi'])
+                if html:
+                    metadata = self.parse_article_metadata(html)
+                    for field in fields:
+                        paper_info[field] = paper_info[field] or metadata[field]
+        
+        # 仍有字段缺失时下载PDF并提取pub_data, affiliations；selenium模式下按驱动池大小并发下载
+        to_download = [info for info in papers_info
+                       if info['doi'] and not all(info[field] for field in required)]
+        if to_download:
+            workers = self.driver_pool.size if self.use_selenium else 1
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                paths = list(executor.map(lambda info: self.download_pdf(info['doi'], info['title']), to_download))
+            for paper_info, path in zip(to_download, paths):
+                if path:
+                    # 损坏或不完整的PDF（例如之前中断下载留下的文件）不应中断整个爬取
+                    try:
+                        metadata = PDFExtractor().extract_info(path)
+                    except Exception as e:
+                        print(f"Error extracting PDF {path}: {e}")
+                        continue
+                    for field in fields:
+                        paper_info[field] = paper_info[field] or metadata.get(field, '')
+        
         return papers_info
 
     def generate_summary(self, title, abstract):
         """生成中文内容简介"""
-        prompt = f"""
-        请根据以下论文的标题和摘要，生成一段中文内容简介（150字左右），如果文章有这些相关信息，则重点说明：
-        1. 研究目的和方法
-        2. 使用的AI技术
-        3. 主要发现和结论
-        4. 应用场景和实验装置
-        如果文章没有这些相关信息，则不用提及。
-        
-        标题：{title}
-        摘要：{abstract}
-        """
-        
-        messages = [
-            {"role": "system", "content": "你是一个专业的核聚变领域专家。'disruption', 'stellarator', 'renormalization'分别翻译为'破裂', '仿星器', '重整化'。'SOL', 'ITER'则不用翻译。"},
-            {"role": "user", "content": prompt}
-        ]
+        messages = build_summary_messages(title, abstract)
         
         with torch.no_grad():
             text = self.tokenizer.apply_chat_template(
@@ -259,53 +349,7 @@ class PaperScraper:
 
     def is_ai_related(self, title, abstract):
         """使用Qwen模型判断论文是否与AI相关"""
-        # print(f"Abstract preview: {abstract[:200]}...")
-        
-        prompt = f"""
-        请判断以下论文是否与人工智能和磁约束核聚变相关。
-        判断标准：
-        1. 论文涉及机器学习、深度学习、神经网络等AI技术，
-        2. 论文应用于磁约束核聚变领域
-        3. 如果只是普通的数值模拟或者物理分析，不算是AI相关
-        
-        标题：{title}
-        摘要：{abstract}
-        
-        请分析后回答"True"或"False"，并用中文简要说明原因。
-        """
-        
-        messages = [
-            {"role": "system", "content": "你是一个专业的核聚变领域专家。'disruption', 'stellarator', 'renormalization'分别翻译为'破裂', '仿星器', '重整化'。'SOL', 'ITER'则不用翻译。"},
-            {"role": "user", "content": prompt}
-        ]
-        
-        with torch.no_grad():
-            text = self.tokenizer.apply_chat_template(
-                messages,
-                tokenize=False,
-                add_generation_prompt=True
-            )
-            
-            model_inputs = self.tokenizer([text], return_tensors="pt").to(self.model.device)
-            input_length = model_inputs.input_ids.shape[1]  # 获取输入长度
-            
-            generated_ids = self.model.generate(
-                **model_inputs,
-                max_new_tokens=50, # 经过测试的合适值
-                do_sample=True
-            )
-            
-            # 只获取新生成的部分（最后一次回答）
-            response = self.tokenizer.batch_decode(
-                generated_ids[:, input_length:], 
-                skip_special_tokens=True
-            )[0]
-        
-        if "True" in response:
-            print(f"AI analysis result: {response}")  # 打印分析结果
-            return True
-        else:
-            return False
+        return self.classifier.is_ai_related(title, abstract)
 
     def scrape_papers(self, start_year, end_year, start_month, end_month):
         """爬取指定年份和月份的期刊论文"""
@@ -344,7 +388,7 @@ class PaperScraper:
         # 定义列顺序
         columns_order = [
             'title', 'journal', 'volume_issue', 'doi', 'first_institution', 
-            'second_institution', 'summary', 'pub_date'
+            'second_institution', 'summary', 'pub_date', 'abstract', 'summary_prompt'
         ]
         
         # 创建新数据的DataFrame
@@ -358,10 +402,24 @@ class PaperScraper:
         # 按指定顺序排列列
         new_df = new_df[columns_order]
         
+        # 爬取时生成的内容简介使用默认提示词，与PaperSummarizer使用相同的标识
+        has_summary = new_df['summary'].fillna('') != ''
+        new_df.loc[has_summary, 'summary_prompt'] = summary_prompt_id()
+        
         try:
             # 如果文件存在，读取现有数据并追加新数据
             if os.path.exists(filename):
                 existing_df = pd.read_excel(filename)
+                # defer_summary爬取的新记录没有内容简介，保留已有的内容简介
+                if 'summary' in existing_df.columns:
+                    existing_summaries = dict(zip(existing_df['title'], existing_df['summary'].fillna('')))
+                    missing = new_df['summary'].fillna('') == ''
+                    new_df.loc[missing, 'summary'] = new_df.loc[missing, 'title'].map(existing_summaries).fillna('')
+                    # 同时保留生成该内容简介所用的提示词标识（见PaperSummarizer）
+                    if 'summary_prompt' in existing_df.columns:
+                        existing_prompts = dict(zip(existing_df['title'], existing_df['summary_prompt'].fillna('')))
+                        new_df.loc[missing, 'summary_prompt'] = new_df.loc[missing, 'title'].map(existing_prompts).fillna('')
+
                 # 合并现有数据和新数据
                 combined_df = pd.concat([existing_df, new_df], ignore_index=True)
                 
@@ -388,8 +446,8 @@ class PaperScraper:
 
     def __del__(self):
         """清理资源"""
-        if hasattr(self, 'driver') and self.use_selenium:
-            self.driver.quit()
+        if hasattr(self, 'driver_pool') and self.use_selenium:
+            self.driver_pool.close()
 
     def get_page_content_with_retry(self, volume, issue, max_retries=3):
         """带重试机制的页面获取"""
@@ -452,12 +510,12 @@ class PaperScraper:
                     return None
                 
             if self.use_selenium:
-                # 使用selenium下载
+                # 使用selenium打开文章页通过验证，再用浏览器cookies经共享连接池下载PDF
+                # （无头模式下直接打开PDF地址可能触发下载而不是加载页面，current_url不可用）
                 try:
-                    self.driver.get(pdf_url)
-                    sleep(5)  # 等待PDF加载
-                    
-                    response = requests.get(self.driver.current_url, headers=headers)
+                    with self.driver_pool.acquire() as driver:
+                        self.driver_pool.load(driver, headers['Referer'])
+                        response = self.driver_pool.fetch(driver, pdf_url, headers=headers)
                     if response.status_code == 200 and response.headers.get('Content-Type', '').startswith('application/pdf'):
                         with open(filename, 'wb') as f:
                             f.write(response.content)
@@ -465,6 +523,7 @@ class PaperScraper:
                         return filename
                     else:
                         print(f"Selenium download failed: {response.status_code}")
+                        return None
                 except Exception as e:
                     print(f"Selenium download error: {e}")
                     return None
@@ -0,0 +1,188 @@
+import os
+import hashlib
+import pandas as pd
+import torch
+from modelscope import AutoModelForCausalLM, AutoTokenizer
+from prompts import SYSTEM_PROMPT
+
+
+# 提示词中的缩进和空白行（含行尾空格）与原实现保持一致，修改会改变模型输入的token
+SUMMARY_PROMPT = """
+        请根据以下论文的标题和摘要，生成一段中文内容简介（150字左右），如果文章有这些相关信息，则重点说明：
+        1. 研究目的和方法
+        2. 使用的AI技术
+        3. 主要发现和结论
+        4. 应用场景和实验装置
+        如果文章没有这些相关信息，则不用提及。
+        
+        标题：{title}
+        摘要：{abstract}
+        """
+
+
+def summary_prompt_id(prompt_template=SUMMARY_PROMPT):
+    """提示词标识，写入summary_prompt列，标记内容简介由哪个提示词生成"""
+    return hashlib.md5(prompt_template.encode('utf-8')).hexdigest()[:8]
+
+
+def build_summary_messages(title, abstract, prompt_template=SUMMARY_PROMPT):
+    """构造生成内容简介的对话消息"""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt_template.format(title=title, abstract=abstract)}
+    ]
+
+
+class PaperSummarizer:
+    """离线批量生成内容简介，读取已保存的Excel结果并逐批写回"""
+
+    def __init__(self, model_name="Qwen/Qwen2.5-7B-Instruct", model=None, tokenizer=None,
+                 prompt_template=SUMMARY_PROMPT, max_new_tokens=300,
+                 max_batch_size=8, max_batch_tokens=8192):
+        """
+        Args:
+            model_name: 模型名称，未传入model/tokenizer时加载
+            model, tokenizer: 可复用已加载的模型（例如PaperScraper中的模型）
+            prompt_template: 内容简介提示词，需包含{title}和{abstract}
+            max_new_tokens: 每篇论文最多生成的token数
+            max_batch_size: 每批最多论文数
+            max_batch_tokens: 每批token预算（批大小 × (最长提示长度 + max_new_tokens)）
+        """
+        self.model_name = model_name
+        if model is None:
+            model = AutoModelForCausalLM.from_pretrained(
+                model_name,
+                torch_dtype="auto",
+                device_map="auto",
+                trust_remote_code=True
+            )
+        if tokenizer is None:
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = model
+        self.tokenizer = tokenizer
+        self.prompt_template = prompt_template
+        # 用于overwrite时跳过已用当前提示词生成的论文
+        self.prompt_id = summary_prompt_id(prompt_template)
+        self.max_new_tokens = max_new_tokens
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+
+    def build_prompt(self, title, abstract):
+        """生成经过chat模板处理的提示文本"""
+        return self.tokenizer.apply_chat_template(
+            build_summary_messages(title, abstract, self.prompt_template),
+            tokenize=False,
+            add_generation_prompt=True
+        )
+
+    def make_batches(self, prompts):
+        """
+        按提示长度排序后动态组批，使同一批内长度接近以减少padding
+        Args:
+            prompts: [(key, prompt_text), ...]
+        返回: [[(key, prompt_text), ...], ...]
+        """
+        lengths = {key: len(self.tokenizer(text).input_ids) for key, text in prompts}
+        ordered = sorted(prompts, key=lambda item: lengths[item[0]])
+
+        batches = []
+        batch = []
+        for key, text in ordered:
+            # 排序后当前提示最长，按其长度估算加入后的token开销
+            cost = (len(batch) + 1) * (lengths[key] + self.max_new_tokens)
+            if batch and (len(batch) >= self.max_batch_size or cost > self.max_batch_tokens):
+                batches.append(batch)
+                batch = []
+            batch.append((key, text))
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def generate_batch(self, texts):
+        """批量生成内容简介，所有序列都输出EOS后提前结束"""
+        # 生成任务需要左侧padding，保证新token紧接在提示之后
+        padding_side = self.tokenizer.padding_side
+        self.tokenizer.padding_side = 'left'
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        try:
+            with torch.no_grad():
+                model_inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.model.device)
+                input_length = model_inputs.input_ids.shape[1]
+
+                generated_ids = self.model.generate(
+                    **model_inputs,
+                    max_new_tokens=self.max_new_tokens,
+                    do_sample=True,
+                    temperature=0.7,
+                    pad_token_id=self.tokenizer.pad_token_id
+                )
+
+                summaries = self.tokenizer.batch_decode(
+                    generated_ids[:, input_length:],
+                    skip_special_tokens=True
+                )
+        finally:
+            self.tokenizer.padding_side = padding_side
+
+        return [summary.strip() for summary in summaries]
+
+    def summarize_file(self, filename="ai_fusion_papers.xlsx", overwrite=False):
+        """
+        为Excel中已保存的论文生成内容简介，每完成一批就写回文件
+        Args:
+            filename: PaperScraper.save_to_excel保存的文件
+            overwrite: 为True时重新生成不是用当前提示词生成的内容简介（例如更换了提示词），
+                已用当前提示词生成的论文会跳过，因此中断后同样可以继续运行
+        """
+        if not os.path.exists(filename):
+            print(f"File not found: {filename}")
+            return
+
+        df = pd.read_excel(filename)
+        if 'abstract' not in df.columns:
+            print("No 'abstract' column in file, please re-crawl to store abstracts")
+            return
+        if 'summary' not in df.columns:
+            df['summary'] = ''
+        if 'summary_prompt' not in df.columns:
+            df['summary_prompt'] = ''
+        df['summary'] = df['summary'].fillna('').astype(str)
+        df['summary_prompt'] = df['summary_prompt'].fillna('').astype(str)
+        df['abstract'] = df['abstract'].fillna('').astype(str)
+
+        prompts = []
+        for idx, row in df.iterrows():
+            if not row['abstract']:
+                print(f"Skipping paper without abstract: {row['title']}")
+                continue
+            if row['summary'] and (not overwrite or row['summary_prompt'] == self.prompt_id):
+                continue
+            prompts.append((idx, self.build_prompt(row['title'], row['abstract'])))
+
+        if not prompts:
+            print("No papers need summarizing")
+            return
+
+        batches = self.make_batches(prompts)
+        print(f"Summarizing {len(prompts)} papers in {len(batches)} batches")
+
+        done = 0
+        for i, batch in enumerate(batches):
+            try:
+                summaries = self.generate_batch([text for _, text in batch])
+            except Exception as e:
+                print(f"Error summarizing batch {i + 1}: {e}")
+                continue
+
+            for (idx, _), summary in zip(batch, summaries):
+                df.at[idx, 'summary'] = summary
+                df.at[idx, 'summary_prompt'] = self.prompt_id
+            done += len(batch)
+
+            # 增量写回，中断后重新运行会跳过已生成的论文
+            df.to_excel(filename, index=False)
+            print(f"Batch {i + 1}/{len(batches)} done, {done}/{len(prompts)} papers summarized")
+
+        print(f"\nSummaries saved to {filename}")